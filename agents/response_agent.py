@@ -50,6 +50,7 @@ Guidelines:
 3. If customer information is needed and provided, look it up
 4. Be specific and actionable in your responses
 5. If you cannot find sufficient information, acknowledge this and suggest contacting human support
+6. If the Additional Context contains the earlier conversation or a known customer record, take it into account
 
 Query Category: {category}
 Customer Query: {input}
@@ -57,40 +58,68 @@ Additional Context: {context}
 
 {agent_scratchpad}""")
         
+        self.agent_executor = self._build_executor(self.tools)
+        # Used when the customer's record is already known, so it cannot be looked up again
+        self.agent_executor_without_crm = self._build_executor([self.rag_tool.get_tool()])
+    
+    def _build_executor(self, tools: list) -> AgentExecutor:
+        """Build a ReAct agent executor over the given tools."""
         agent = create_react_agent(
             llm=self.llm,
-            tools=self.tools,
+            tools=tools,
             prompt=self.prompt_template
         )
         
-        self.agent_executor = AgentExecutor(
+        return AgentExecutor(
             agent=agent,
-            tools=self.tools,
+            tools=tools,
             verbose=False,
-            handle_parsing_errors=True
+            handle_parsing_errors=True,
+            return_intermediate_steps=True
         )
     
     def generate_response(self, query: str, category: str, context: str = "") -> str:
         """Generate a response using available tools and context."""
+        return self.generate_response_details(query, category, context)["output"]
+    
+    def generate_response_details(self, query: str, category: str, context: str = "",
+                                  lookup_customer: bool = True) -> dict:
+        """Generate a response and return it with any customer record the agent looked up.
+        
+        With lookup_customer=False the agent runs without the CRM tool.
+        """
+        executor = self.agent_executor if lookup_customer else self.agent_executor_without_crm
         try:
-            result = self.agent_executor.invoke({
+            result = executor.invoke({
                 "input": query,
                 "category": category,
                 "context": context
             })
-            return result["output"]
+            customer_record = ""
+            for action, observation in result.get("intermediate_steps", []):
+                if action.tool == "get_customer_account_status" and str(observation).startswith("Customer Information:"):
+                    customer_record = str(observation)
+            return {"output": result["output"], "customer_record": customer_record}
         except Exception as e:
-            return f"I apologize, but I encountered an error while processing your request. Please contact our human support team for assistance. Error: {str(e)}"
+            return {
+                "output": f"I apologize, but I encountered an error while processing your request. Please contact our human support team for assistance. Error: {str(e)}",
+                "customer_record": ""
+            }
     
-    def simple_response(self, query: str, category: str, retrieved_info: str = "") -> str:
+    def simple_response(self, query: str, category: str, retrieved_info: str = "", history: str = "",
+                        customer_record: str = "") -> str:
         """Generate a simple response without agent executor for fallback."""
         try:
             system_prompt = f"""You are a helpful customer support agent. 
             
 The customer's query has been classified as: {category}
 
+{f"Conversation so far: {history}" if history else ""}
+
 {f"Here's relevant information from our knowledge base: {retrieved_info}" if retrieved_info else ""}
 
+{f"Known customer record: {customer_record}" if customer_record else ""}
+
 Please provide a helpful, professional response to the customer's query. If you don't have enough information, acknowledge this and suggest contacting human support."""
             
             messages = [
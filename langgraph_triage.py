@@ -1,25 +1,36 @@
-from typing import TypedDict, Annotated
+from typing import TypedDict, Annotated, Optional
 from langgraph.graph import StateGraph, END
 from agents.classifier_agent import QueryClassifierAgent
 from agents.response_agent import ResponseGenerationAgent
 from agents.escalation_agent import EscalationAgent
 from tools.rag_tool import RAGTool
+from tools.crm_tool import extract_customer_identifiers
+from session_store import SessionStore
 import json
 
 class TriageState(TypedDict):
     query: str
+    session_id: str
+    history: str
+    reuse_context: bool
+    cached_classification: str
     classification: str
     retrieved_info: str
+    retrieved_chunks: list
+    customer_record: str
     response: str
     escalation_decision: dict
     final_output: str
 
 class CustomerSupportTriageSystem:
-    def __init__(self):
+    def __init__(self, max_sessions: int = 1000, session_ttl_seconds: float = 1800,
+                 history_token_budget: int = 1000):
         self.classifier = QueryClassifierAgent()
         self.response_agent = ResponseGenerationAgent()
         self.escalation_agent = EscalationAgent()
         self.rag_tool = RAGTool()
+        self.sessions = SessionStore(max_sessions=max_sessions, ttl_seconds=session_ttl_seconds)
+        self.history_token_budget = history_token_budget
         
         # Build the graph
         self.graph = self._build_graph()
@@ -29,6 +40,7 @@ class CustomerSupportTriageSystem:
         workflow = StateGraph(TriageState)
         
         # Add nodes
+        workflow.add_node("load_session", self._load_session_node)
         workflow.add_node("classify", self._classify_node)
         workflow.add_node("search_knowledge", self._search_knowledge_node)
         workflow.add_node("generate_response", self._generate_response_node)
@@ -37,10 +49,21 @@ class CustomerSupportTriageSystem:
         workflow.add_node("finalize", self._finalize_node)
         
         # Set entry point
-        workflow.set_entry_point("classify")
+        workflow.set_entry_point("load_session")
         
         # Add edges
-        workflow.add_edge("classify", "search_knowledge")
+        workflow.add_edge("load_session", "classify")
+        
+        # Follow-ups on the same topic skip retrieval
+        workflow.add_conditional_edges(
+            "classify",
+            self._should_reuse_context,
+            {
+                "reuse": "generate_response",
+                "search": "search_knowledge"
+            }
+        )
+        
         workflow.add_edge("search_knowledge", "generate_response")
         workflow.add_edge("generate_response", "check_escalation")
         
@@ -59,36 +82,109 @@ class CustomerSupportTriageSystem:
         
         return workflow.compile()
     
+    def _load_session_node(self, state: TriageState) -> TriageState:
+        """Load cached conversation context and check whether the query stays on the cached topic."""
+        if not state["session_id"]:
+            return state
+        
+        session = self.sessions.get(state["session_id"])
+        history = session.format_history(self.history_token_budget)
+        customer_record = session.customer_record
+        
+        # Drop the cached record when the query names a different customer
+        mentioned = extract_customer_identifiers(state["query"])
+        if customer_record and mentioned and not mentioned & extract_customer_identifiers(customer_record):
+            customer_record = ""
+        
+        updates = {"history": history, "customer_record": customer_record}
+        
+        # Offer the cached chunks for reuse when the query's nearest chunk is
+        # the top-ranked chunk retrieved earlier in this conversation
+        if session.classification and session.retrieved_chunks:
+            nearest = self.rag_tool.nearest_chunks(state["query"], k=1)
+            if nearest and session.is_top_chunk(nearest[0]):
+                updates.update({
+                    "cached_classification": session.classification,
+                    "retrieved_info": session.retrieved_info,
+                    "retrieved_chunks": session.retrieved_chunks
+                })
+        
+        return {**state, **updates}
+    
     def _classify_node(self, state: TriageState) -> TriageState:
         """Classify the customer query."""
         classification = self.classifier.classify_query(state["query"])
-        return {**state, "classification": classification}
+        # Cached chunks are only reused if the follow-up keeps the same category
+        reuse_context = bool(state["cached_classification"]) and classification == state["cached_classification"]
+        return {**state, "classification": classification, "reuse_context": reuse_context}
+    
+    def _should_reuse_context(self, state: TriageState) -> str:
+        """Route follow-ups on the same topic straight to response generation."""
+        return "reuse" if state["reuse_context"] else "search"
     
     def _search_knowledge_node(self, state: TriageState) -> TriageState:
         """Search the knowledge base for relevant information."""
         if state["classification"] in ["technical", "shipping", "returns", "billing", "product"]:
-            retrieved_info = self.rag_tool.search_knowledge_base(state["query"])
+            retrieved_info, retrieved_chunks = self.rag_tool.search_with_sources(state["query"])
         else:
-            retrieved_info = ""
-        return {**state, "retrieved_info": retrieved_info}
+            retrieved_info, retrieved_chunks = "", []
+        return {**state, "retrieved_info": retrieved_info, "retrieved_chunks": retrieved_chunks}
     
     def _generate_response_node(self, state: TriageState) -> TriageState:
         """Generate a response based on the query and retrieved information."""
+        customer_record = state.get("customer_record", "")
+        
+        # Follow-ups on the same topic answer from the cached chunks and record
+        # without an agent, so no retrieval or CRM tool is called again
+        if state.get("reuse_context"):
+            response = self._simple_response(state, customer_record)
+            return {**state, "response": response}
+        
         try:
-            # Try using the agent with tools first
-            response = self.response_agent.generate_response(
+            # Try using the agent with tools first; the CRM tool is left out
+            # when the customer's record is already cached
+            result = self.response_agent.generate_response_details(
                 state["query"], 
-                state["classification"]
+                state["classification"],
+                self._build_context(state),
+                lookup_customer=not customer_record
             )
+            response = result["output"]
+            customer_record = result["customer_record"] or customer_record
         except Exception:
             # Fallback to simple response
-            response = self.response_agent.simple_response(
-                state["query"], 
-                state["classification"], 
-                state.get("retrieved_info", "")
-            )
+            response = self._simple_response(state, customer_record)
+        
+        return {**state, "response": response, "customer_record": customer_record}
+    
+    def _simple_response(self, state: TriageState, customer_record: str) -> str:
+        """Generate a response without tools from the context already in the state."""
+        return self.response_agent.simple_response(
+            state["query"], 
+            state["classification"], 
+            self._knowledge_context(state),
+            state.get("history", ""),
+            customer_record
+        )
+    
+    def _build_context(self, state: TriageState) -> str:
+        """Build the additional context passed to the response agent."""
+        parts = []
+        if state.get("history"):
+            parts.append(f"Conversation so far:\n{state['history']}")
+        if state.get("customer_record"):
+            parts.append(f"Known customer record:\n{state['customer_record']}")
+        return "\n\n".join(parts)
+    
+    def _knowledge_context(self, state: TriageState) -> str:
+        """Return the knowledge base context for a turn.
         
-        return {**state, "response": response}
+        Follow-ups use the cached chunks themselves rather than the answer
+        given to the earlier question.
+        """
+        if state.get("reuse_context") and state.get("retrieved_chunks"):
+            return "\n\n".join(chunk.page_content for chunk in state["retrieved_chunks"])
+        return state.get("retrieved_info", "")
     
     def _check_escalation_node(self, state: TriageState) -> TriageState:
         """Check if the query should be escalated."""
@@ -131,12 +227,23 @@ This response was generated automatically. If you need further assistance, pleas
         """Determine routing based on escalation decision."""
         return "escalate" if state["escalation_decision"]["escalate"] else "continue"
     
-    def process_query(self, query: str) -> dict:
-        """Process a customer query through the entire triage system."""
+    def process_query(self, query: str, session_id: Optional[str] = None) -> dict:
+        """Process a customer query through the entire triage system.
+        
+        When a session_id is given, conversation history and the last
+        classification, retrieved chunks and customer record are cached
+        and reused for follow-up queries on the same topic.
+        """
         initial_state = {
             "query": query,
+            "session_id": session_id or "",
+            "history": "",
+            "reuse_context": False,
+            "cached_classification": "",
             "classification": "",
             "retrieved_info": "",
+            "retrieved_chunks": [],
+            "customer_record": "",
             "response": "",
             "escalation_decision": {},
             "final_output": ""
@@ -145,13 +252,38 @@ This response was generated automatically. If you need further assistance, pleas
         # Run the graph
         result = self.graph.invoke(initial_state)
         
+        if session_id:
+            self._save_session(session_id, result)
+        
         return {
             "query": result["query"],
+            "session_id": session_id,
             "classification": result["classification"],
+            "reused_context": result["reuse_context"],
             "escalated": result["escalation_decision"].get("escalate", False),
             "priority": result["escalation_decision"].get("priority", "low"),
             "output": result["final_output"]
         }
+    
+    def _save_session(self, session_id: str, result: TriageState):
+        """Store the outcome of a turn in the session cache."""
+        session = self.sessions.get(session_id)
+        decision = result["escalation_decision"]
+        if decision.get("escalate"):
+            # The customer only saw the escalation notice, not the drafted response
+            reply = f"Escalated to human support ({decision.get('priority', 'medium')} priority): {decision.get('reason', '')}"
+        else:
+            reply = result["response"] or result["final_output"]
+        session.add_turn(result["query"], reply)
+        if not result["reuse_context"]:
+            session.classification = result["classification"]
+            session.retrieved_info = result["retrieved_info"]
+            session.retrieved_chunks = result["retrieved_chunks"]
+        session.customer_record = result["customer_record"]
+    
+    def reset_session(self, session_id: str):
+        """Forget all cached context for a conversation."""
+        self.sessions.reset(session_id)
 
 # Example usage
 if __name__ == "__main__":
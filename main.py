@@ -6,6 +6,7 @@ Multi-agent system using LangGraph for intelligent customer support automation
 
 import os
 import sys
+import uuid
 from dotenv import load_dotenv
 from langgraph_triage import CustomerSupportTriageSystem
 
@@ -27,7 +28,8 @@ def main():
     print("2. Search relevant knowledge base")
     print("3. Generate an appropriate response")
     print("4. Determine if human escalation is needed")
-    print("\nType 'quit' to exit, 'test' to run test queries")
+    print("\nFollow-up queries reuse the context of the current conversation.")
+    print("Type 'quit' to exit, 'new' to start a new conversation, 'test' to run test queries")
     print("=" * 50)
     
     # Initialize the system
@@ -39,6 +41,8 @@ def main():
         print(f"❌ Error initializing system: {str(e)}")
         sys.exit(1)
     
+    session_id = str(uuid.uuid4())
+    
     while True:
         try:
             print("\n" + "-" * 40)
@@ -48,6 +52,12 @@ def main():
                 print("\n👋 Thank you for using the Customer Support Triage System!")
                 break
             
+            if user_input.lower() == 'new':
+                system.reset_session(session_id)
+                session_id = str(uuid.uuid4())
+                print("🆕 Started a new conversation.")
+                continue
+            
             if user_input.lower() == 'test':
                 run_test_queries(system)
                 continue
@@ -60,13 +70,15 @@ def main():
             print("⏳ Please wait...")
             
             # Process the query
-            result = system.process_query(user_input)
+            result = system.process_query(user_input, session_id=session_id)
             
             # Display results
             print("\n" + "=" * 60)
             print("📊 TRIAGE RESULTS")
             print("=" * 60)
             print(f"📋 Classification: {result['classification'].upper()}")
+            if result['reused_context']:
+                print("♻️  Follow-up: reused conversation context")
             print(f"🚨 Escalated: {'YES' if result['escalated'] else 'NO'}")
             if result['escalated']:
                 print(f"⚡ Priority: {result['priority'].upper()}")
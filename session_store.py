@@ -0,0 +1,99 @@
+import time
+import threading
+from collections import OrderedDict
+import tiktoken
+
+MAX_HISTORY_MESSAGES = 50
+
+
+class ConversationSession:
+    """Cached context for a single customer conversation."""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.history = []
+        self.classification = ""
+        self.retrieved_info = ""
+        self.retrieved_chunks = []
+        self.customer_record = ""
+        self.last_access = time.monotonic()
+
+    def add_turn(self, query: str, response: str):
+        """Record a customer query and the response given to it."""
+        self.history.append(("Customer", query))
+        self.history.append(("Agent", response))
+        del self.history[:-MAX_HISTORY_MESSAGES]
+
+    def is_top_chunk(self, chunk) -> bool:
+        """Return whether a chunk is the top-ranked cached retrieved chunk."""
+        if not self.retrieved_chunks:
+            return False
+        top = self.retrieved_chunks[0]
+        return (top.page_content == chunk.page_content
+                and top.metadata.get("source") == chunk.metadata.get("source"))
+
+    def format_history(self, max_tokens: int, model: str = "gpt-3.5-turbo") -> str:
+        """Return the most recent turns that fit within the token budget.
+
+        The message that crosses the budget is trimmed to the tokens left
+        rather than dropped, so the latest context is never lost entirely.
+        """
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+
+        lines = []
+        used = 0
+        for role, text in reversed(self.history):
+            line = f"{role}: {text}"
+            tokens = encoding.encode(line)
+            remaining = max_tokens - used
+            if len(tokens) > remaining:
+                if remaining > 0:
+                    lines.append(encoding.decode(tokens[:remaining]) + " ...")
+                break
+            lines.append(line)
+            used += len(tokens)
+        return "\n".join(reversed(lines))
+
+
+class SessionStore:
+    """Bounded in-memory session store with TTL and least-recently-used eviction."""
+
+    def __init__(self, max_sessions: int = 1000, ttl_seconds: float = 1800):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> ConversationSession:
+        """Return the session for session_id, creating a fresh one if missing or expired."""
+        with self._lock:
+            now = time.monotonic()
+            self._evict_expired(now)
+
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = ConversationSession(session_id)
+                self._sessions[session_id] = session
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session_id)
+
+            session.last_access = now
+            return session
+
+    def reset(self, session_id: str):
+        """Drop all cached context for a session."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def _evict_expired(self, now: float):
+        """Remove sessions that have not been accessed within the TTL."""
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.last_access < self.ttl_seconds:
+                break
+            self._sessions.popitem(last=False)
@@ -1,6 +1,14 @@
+import re
 import pandas as pd
 from langchain.tools import Tool
-from typing import Optional
+from typing import Optional, Set
+
+CUSTOMER_ID_PATTERN = re.compile(r"\bCUST\d+\b", re.IGNORECASE)
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+
+def extract_customer_identifiers(text: str) -> Set[str]:
+    """Return the customer IDs and email addresses mentioned in text, lowercased."""
+    return {match.lower() for pattern in (CUSTOMER_ID_PATTERN, EMAIL_PATTERN) for match in pattern.findall(text)}
 
 class CRMTool:
     def __init__(self, crm_data_path: str = "data/mock_crm_data.csv"):
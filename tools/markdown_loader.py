@@ -0,0 +1,185 @@
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterator, List, Optional
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.+?)(?:\s+#+)?\s*$")
+FENCE_PATTERN = re.compile(r"^\s*(```|~~~)")
+
+
+def _chunk_text(prefix: str, text: str) -> str:
+    """Prefix chunk text with its heading path so headings reach the embedding."""
+    return f"{prefix}\n{text}" if prefix else text
+
+
+def _text_prefix(path_parts: List[str], chunk_size: int) -> str:
+    """Return the heading path used as chunk prefix, shortened if it would crowd out the body."""
+    prefix = " > ".join(path_parts)
+    if len(prefix) > chunk_size // 2 and path_parts:
+        prefix = path_parts[-1]
+    return prefix[:chunk_size // 2]
+
+
+def _parse_sections(lines: List[str]) -> List[tuple]:
+    """Group lines into (heading path, heading lines, body) sections.
+
+    Sections with a heading but no body are not emitted; their heading is
+    carried forward and placed before the heading of the next section.
+    """
+    sections = []
+    heading_path = []
+    heading = None
+    body_lines = []
+    carried = []
+    in_fence = False
+
+    def flush():
+        body = "\n".join(body_lines).strip()
+        if body:
+            headings = carried + [heading] if heading else list(carried)
+            sections.append((list(heading_path), headings, body))
+            carried.clear()
+        elif heading:
+            carried.append(heading)
+
+    for line in lines:
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+        match = None if in_fence else HEADING_PATTERN.match(line)
+        if match:
+            flush()
+            body_lines = []
+            level = len(match.group(1))
+            heading_path = heading_path[:level - 1] + [match.group(2)]
+            heading = (match.group(2), line.strip())
+        else:
+            body_lines.append(line)
+    flush()
+    return sections
+
+
+def split_markdown_file(path: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> List[Document]:
+    """Read a markdown file and split it into chunks along its heading structure.
+
+    Adjacent small sections that are siblings under the same parent heading
+    are merged up to chunk_size; sections that are still too large are split
+    with a recursive character splitter. Every chunk starts with its heading
+    path, and the paths of all sections it covers are kept in its metadata.
+    """
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+
+    def section_text(members: List[tuple], prefix_parts: List[str]) -> str:
+        # Headings already named by the chunk prefix are not repeated in the text
+        blocks = []
+        for _, headings, body in members:
+            lines_ = [line for title, line in headings if title not in prefix_parts]
+            blocks.append("\n".join(lines_ + [body]))
+        return "\n\n".join(blocks)
+
+    # Each group is (parent path, [(path, heading lines, body), ...])
+    groups = []
+    for section in _parse_sections(lines):
+        parent = section[0][:-1]
+        if groups and groups[-1][0] == parent and parent:
+            candidate = groups[-1][1] + [section]
+            text = section_text(candidate, parent)
+            if len(_chunk_text(_text_prefix(parent, chunk_size), text)) <= chunk_size:
+                groups[-1] = (parent, candidate)
+                continue
+        groups.append((parent, [section]))
+
+    chunks = []
+    for parent, members in groups:
+        path_parts = members[0][0] if len(members) == 1 else parent
+        text = section_text(members, path_parts)
+
+        metadata = {
+            "source": path,
+            "section": " > ".join(path_parts),
+            "headers": path_parts,
+            "sections": [" > ".join(member[0]) for member in members]
+        }
+        prefix = _text_prefix(path_parts, chunk_size)
+        content = _chunk_text(prefix, text)
+        if len(content) <= chunk_size:
+            chunks.append(Document(page_content=content, metadata=metadata))
+            continue
+
+        body_size = chunk_size - len(prefix) - 1 if prefix else chunk_size
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=body_size,
+            chunk_overlap=min(chunk_overlap, body_size // 2)
+        )
+        for piece in splitter.split_text(text):
+            chunks.append(Document(page_content=_chunk_text(prefix, piece), metadata=dict(metadata)))
+    return chunks
+
+
+def _split_markdown_file_args(args: tuple) -> List[Document]:
+    """Unpack arguments for split_markdown_file when run in a worker process."""
+    return split_markdown_file(*args)
+
+
+class MarkdownLoader:
+    """Load and chunk the markdown files of a directory without external parsers.
+
+    Files are read directly and split on their headings. For large corpora the
+    work is spread across a process pool, and chunks are yielded as each file
+    completes so callers can consume them in batches.
+    """
+
+    def __init__(self, directory: str, glob_suffix: str = ".md", chunk_size: int = 1000,
+                 chunk_overlap: int = 200, max_workers: Optional[int] = None,
+                 parallel_threshold: int = 32):
+        self.directory = directory
+        self.glob_suffix = glob_suffix
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.max_workers = max_workers
+        self.parallel_threshold = parallel_threshold
+
+    def _file_paths(self) -> List[str]:
+        """Return the sorted paths of all matching files in the directory."""
+        return sorted(
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(self.glob_suffix)
+        )
+
+    def lazy_load(self) -> Iterator[Document]:
+        """Yield chunks file by file, using a process pool for large directories."""
+        paths = self._file_paths()
+        args = [(path, self.chunk_size, self.chunk_overlap) for path in paths]
+
+        if len(paths) < self.parallel_threshold or self.max_workers == 1:
+            for arg in args:
+                yield from _split_markdown_file_args(arg)
+            return
+
+        # Keep a bounded window of files in flight so results are produced only
+        # as fast as they are consumed, and pending work is cancelled if the
+        # consumer stops early
+        workers = self.max_workers or os.cpu_count() or 1
+        remaining = iter(args)
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            pending = deque(
+                executor.submit(_split_markdown_file_args, arg)
+                for arg in islice(remaining, workers * 2)
+            )
+            while pending:
+                chunks = pending.popleft().result()
+                for arg in islice(remaining, 1):
+                    pending.append(executor.submit(_split_markdown_file_args, arg))
+                yield from chunks
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def load(self) -> List[Document]:
+        """Load all chunks into a list."""
+        return list(self.lazy_load())
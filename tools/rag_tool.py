@@ -1,18 +1,19 @@
 import os
-from typing import List
+from typing import Iterable, Iterator, List, Tuple
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from langchain_community.vectorstores import FAISS
-from langchain_community.document_loaders import DirectoryLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.chains import RetrievalQA
+from langchain.schema import Document
 from langchain.tools import Tool
 from dotenv import load_dotenv
+from tools.markdown_loader import MarkdownLoader
 
 load_dotenv()
 
 class RAGTool:
-    def __init__(self, knowledge_base_path: str = "knowledge_base"):
+    def __init__(self, knowledge_base_path: str = "knowledge_base", embedding_batch_size: int = 64):
         self.knowledge_base_path = knowledge_base_path
+        self.embedding_batch_size = embedding_batch_size
         self.embeddings = OpenAIEmbeddings()
         self.llm = ChatOpenAI(temperature=0, model="gpt-3.5-turbo")
         self.vector_store = None
@@ -21,23 +22,41 @@ class RAGTool:
     
     def _setup_rag(self):
         """Load documents, create embeddings, and set up RAG chain."""
-        loader = DirectoryLoader(self.knowledge_base_path, glob="*.md")
-        documents = loader.load()
-        
-        text_splitter = RecursiveCharacterTextSplitter(
+        loader = MarkdownLoader(
+            self.knowledge_base_path,
             chunk_size=1000,
             chunk_overlap=200
         )
-        splits = text_splitter.split_documents(documents)
         
-        self.vector_store = FAISS.from_documents(splits, self.embeddings)
+        # Stream chunks into the index in batches instead of materializing them all
+        for batch in self._batched(loader.lazy_load(), self.embedding_batch_size):
+            if self.vector_store is None:
+                self.vector_store = FAISS.from_documents(batch, self.embeddings)
+            else:
+                self.vector_store.add_documents(batch)
+        
+        if self.vector_store is None:
+            raise ValueError(f"No markdown documents found in {self.knowledge_base_path}")
         
         self.qa_chain = RetrievalQA.from_chain_type(
             llm=self.llm,
             chain_type="stuff",
-            retriever=self.vector_store.as_retriever(search_kwargs={"k": 3})
+            retriever=self.vector_store.as_retriever(search_kwargs={"k": 3}),
+            return_source_documents=True
         )
     
+    @staticmethod
+    def _batched(items: Iterable, size: int) -> Iterator[List]:
+        """Yield lists of up to size items from an iterable."""
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
     def search_knowledge_base(self, query: str) -> str:
         """Search the knowledge base for relevant information."""
         try:
@@ -46,6 +65,21 @@ class RAGTool:
         except Exception as e:
             return f"Error searching knowledge base: {str(e)}"
     
+    def search_with_sources(self, query: str) -> Tuple[str, List[Document]]:
+        """Search the knowledge base and return the answer with the chunks it used."""
+        try:
+            result = self.qa_chain.invoke({"query": query})
+            return result["result"], result.get("source_documents", [])
+        except Exception as e:
+            return f"Error searching knowledge base: {str(e)}", []
+    
+    def nearest_chunks(self, query: str, k: int = 1) -> List[Document]:
+        """Return the closest chunks to a query without calling the LLM."""
+        try:
+            return self.vector_store.similarity_search(query, k=k)
+        except Exception:
+            return []
+    
     def get_tool(self) -> Tool:
         """Return the RAG tool for use by agents."""
         return Tool(